@@ -0,0 +1,54 @@
+"""
+ratelimit.py
+
+Request pacing shared by the scrape and fetch steps of drn_pipeline.py.
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Spaces calls at least 1/rate seconds apart. Only the remainder of
+    the interval is slept, so a caller that already spent time waiting
+    on the network does not pay the full delay again.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = time.monotonic()
+
+    async def acquire(self):
+        # Reserve the next slot before sleeping (no await in between),
+        # so concurrent callers queue up without needing a lock.
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class RateLimiter:
+    """
+    Bounds the number of in-flight requests and paces request starts
+    through a TokenBucket. Use as `async with limiter:`.
+    """
+
+    def __init__(self, max_concurrent: int, rate: float):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.bucket = TokenBucket(rate)
+
+    async def acquire(self):
+        await self.semaphore.acquire()
+        await self.bucket.acquire()
+
+    def release(self):
+        self.semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
@@ -0,0 +1,797 @@
+#!/usr/bin/env python3
+"""
+drn_pipeline.py
+
+Scrapes Talk: links from the Wikipedia Dispute Resolution Noticeboard
+(DRN) and fetches the wikitext of the linked talk pages.
+
+scrape:
+- Scrapes the main DRN page
+- Scrapes all DRN archive pages
+- Extracts ALL talk-page links (with anchors)
+- Saves them into one zstd-compressed JSONL file: data/drn_links.jsonl.zst
+  (plain data/drn_links.jsonl with --no-zstd),
+  one record per unique link: {"url": ..., "sources": ["main", <archive>, ...]}
+
+fetch:
+Reads drn_links.jsonl(.zst) produced by `scrape`.
+For each Talk: link:
+    - Extract page title and anchor
+    - Fetch full wikitext via MediaWiki API (up to 50 titles per query),
+      or via Special:Export with --use-export (one XML dump per 200 titles)
+    - Write one JSONL record per unique talk page to talkpages.jsonl.zst:
+          (title, revision_timestamp, fetched_at, wikitext_hash, wikitext)
+      Pages whose wikitext is identical to an earlier page (e.g. redirects)
+      carry "duplicate_of" instead of repeating the wikitext.
+    - Write one JSONL record per input link to anchors.jsonl.zst:
+          (title, anchor, url)
+
+With --legacy-flat, a single talkpages.jsonl.zst with one record per
+input link (title, anchor, url, wikitext) is written instead.
+
+Fetched pages are kept (zlib-compressed) in an on-disk cache under
+<outdir>/.apicache for a week, so reruns only fetch pages not seen yet.
+Use --refresh to refetch everything, or --no-cache to bypass the cache.
+
+Both subcommands share one pooled aiohttp session per run; requests are
+bounded by a semaphore (--max-concurrent, default 4) and paced by the
+rate limiter in common/ratelimit.py (--rps, default 1 request/s).
+
+Outputs are zstd-compressed JSONL; pass --no-zstd for plain .jsonl.
+Inputs may be plain or .zst JSONL.
+
+Requirements:
+    aiohttp                 required
+    lxml                    required for --use-export
+    orjson, blake3          optional, faster JSON and URL hashing
+    diskcache               optional, enables the fetch cache
+    zstandard               optional, enables .zst input/output
+Install everything with: pip install -r requirements.txt
+
+Run:
+    python -m drn_pipeline scrape --outdir data
+    python -m drn_pipeline fetch --outdir data
+    python -m drn_pipeline fetch --input data/drn_links.jsonl.zst --outdir data
+    python -m drn_pipeline fetch --input data/drn_links.jsonl.zst --outdir data --legacy-flat
+    python -m drn_pipeline fetch --input data/drn_links.jsonl.zst --outdir data --use-export
+    python -m drn_pipeline fetch --input data/drn_links.jsonl.zst --outdir data --refresh
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import functools
+import hashlib
+import html as htmllib
+import io
+import mmap
+import os
+import random
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urljoin
+
+import aiohttp
+
+from common.ratelimit import RateLimiter
+
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    import json
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf8")
+
+    json_loads = json.loads
+
+try:
+    from blake3 import blake3
+
+    def url_fingerprint(url: str) -> bytes:
+        return blake3(url.encode("utf8")).digest(16)
+except ImportError:
+    def url_fingerprint(url: str) -> bytes:
+        return hashlib.blake2b(url.encode("utf8"), digest_size=16).digest()
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+# Only needed to parse Special:Export dumps (--use-export)
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+USER_AGENT = "TaymProjectBot/0.1 (Taym.mehdi@stud.uni-hannover.de)"
+WIKI_BASE = "https://en.wikipedia.org"
+API_ENDPOINT = "https://en.wikipedia.org/w/api.php"
+EXPORT_ENDPOINT = "https://en.wikipedia.org/wiki/Special:Export"
+# Default pace matches the original serial scripts (1 request/s);
+# raise with --rps / --max-concurrent.
+MAX_CONCURRENT = 4
+REQUESTS_PER_SECOND = 1.0
+POOL_SIZE = 32
+MAX_BACKOFF = 60
+BATCH_SIZE = 50  # max titles per API query for regular users
+EXPORT_BATCH_SIZE = 200
+WRITE_BUFFER = 1 << 20
+ZSTD_LEVEL = 3
+CACHE_DIRNAME = ".apicache"
+CACHE_SIZE_LIMIT = 4 << 30
+CACHE_EXPIRE = 7 * 86400
+
+# Only <a href> values are needed, so match them on the raw bytes instead
+# of building any DOM. MediaWiki always emits double-quoted attributes.
+# The href must be its own attribute of an <a> tag (not data-href, and
+# not <link>/<area> etc.).
+_A_HREF = rb'<a\s(?:[^>]*?\s)?href="('
+_TALK_RE = re.compile(_A_HREF + rb'[^"]*/wiki/Talk:[^"]*)"')
+_ARCH_RE = re.compile(_A_HREF + rb'[^"]*Dispute_resolution_noticeboard[^"]*Archive[^"]*)"')
+
+_WIKI_PREFIX = "https://en.wikipedia.org/wiki/"
+_URL_RE = re.compile(re.escape(_WIKI_PREFIX) + r"([^#]*)(?:#(.*))?$", re.DOTALL)
+
+# DRN archives reference the same pages over and over
+_unquote = functools.lru_cache(maxsize=8192)(unquote)
+
+
+# ---------------------------------------------------------------------------
+# Shared: HTTP session, retries, JSONL I/O
+# ---------------------------------------------------------------------------
+
+def make_session():
+    """
+    All requests go to a single host, so keep one pooled set of
+    keep-alive connections and reuse TCP/TLS across every call.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=POOL_SIZE,
+        limit_per_host=POOL_SIZE,
+        keepalive_timeout=60,
+        ttl_dns_cache=300,
+    )
+    return aiohttp.ClientSession(
+        headers={"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"},
+        connector=connector,
+        # No overall cap: large bodies may take a while, but a stalled
+        # connect or read still fails fast and is retried
+        timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=30),
+    )
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Only rate limiting, server errors and connection/timeout failures are
+    worth retrying; other 4xx answers and malformed bodies are not.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientConnectionError,
+                              aiohttp.ClientPayloadError,
+                              asyncio.TimeoutError))
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Seconds to wait before the next attempt: the server's Retry-After on
+    429/503 if it sent one (at most MAX_BACKOFF), otherwise capped
+    exponential backoff + jitter.
+    """
+    if isinstance(error, aiohttp.ClientResponseError) and error.status in (429, 503):
+        retry_after = (error.headers or {}).get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), MAX_BACKOFF)
+    return min(MAX_BACKOFF, 2 ** attempt) + random.uniform(0, 1)
+
+
+def iter_jsonl(path: str):
+    """
+    Yield one decoded record per line. Plain files are read by slicing
+    lines straight out of an mmap (no text-mode decoding or line splitting
+    in Python); .zst files are decompressed as a stream.
+    """
+    if path.endswith(".zst"):
+        if zstd is None:
+            raise RuntimeError(f"Reading {path} requires the zstandard package "
+                               "(pip install zstandard), or pass a plain .jsonl input")
+        with open(path, "rb") as fin:
+            reader = io.BufferedReader(zstd.ZstdDecompressor().stream_reader(fin))
+            for line in reader:
+                if line.strip():
+                    yield json_loads(line)
+        return
+
+    with open(path, "rb") as fin:
+        if os.fstat(fin.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            start, size = 0, len(mm)
+            while start < size:
+                end = mm.find(b"\n", start)
+                if end == -1:
+                    end = size
+                line = mm[start:end]
+                # Skip blank lines, incl. a lone "\r" left by CRLF files
+                if line.strip():
+                    yield json_loads(line)
+                start = end + 1
+
+
+def open_jsonl_writer(path: str):
+    """
+    Open `path` for writing JSONL bytes; paths ending in .zst are wrapped
+    in a multi-threaded zstd stream writer.
+    """
+    if not path.endswith(".zst"):
+        return open(path, "wb", buffering=WRITE_BUFFER)
+    cctx = zstd.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+    return cctx.stream_writer(open(path, "wb"))
+
+
+def output_path(outdir: str, name: str, compress: bool) -> str:
+    return os.path.join(outdir, name + (".zst" if compress else ""))
+
+
+def default_input() -> str:
+    """
+    Prefer the compressed scrape output when it exists (and can be read),
+    else the plain data/drn_links.jsonl.
+    """
+    path = os.path.join("data", "drn_links.jsonl")
+    if zstd is not None and os.path.exists(path + ".zst"):
+        return path + ".zst"
+    return path
+
+
+def check_compress(compress: bool) -> bool:
+    if compress and zstd is None:
+        print("[WARN] zstandard is not installed; writing uncompressed JSONL")
+        return False
+    return compress
+
+
+# ---------------------------------------------------------------------------
+# scrape: DRN pages → Talk: links
+# ---------------------------------------------------------------------------
+
+async def get_html(url: str, session: aiohttp.ClientSession,
+                   limiter: RateLimiter, retries=3):
+    for attempt in range(retries):
+        try:
+            async with limiter:
+                async with session.get(url) as r:
+                    r.raise_for_status()
+                    return await r.read()
+        except Exception as e:
+            print(f"[WARN] get_html error (attempt {attempt+1}/{retries}): {e}")
+            if not is_transient(e) or attempt == retries - 1:
+                break
+            await asyncio.sleep(retry_delay(e, attempt))
+    raise RuntimeError(f"Failed to fetch {url}")
+
+
+def _href_to_url(raw: bytes) -> str:
+    return urljoin(WIKI_BASE, htmllib.unescape(raw.decode("utf8", "replace")))
+
+
+def extract_talk_links(html: bytes):
+    # Dedup on fixed-size 16-byte fingerprints instead of the URL strings
+    seen_digests = set()
+    links = []
+
+    for m in _TALK_RE.finditer(html):
+        full = _href_to_url(m.group(1))
+        digest = url_fingerprint(full)
+        if digest not in seen_digests:
+            seen_digests.add(digest)
+            links.append(full)
+
+    return sorted(links)
+
+
+def extract_archive_links(html: bytes):
+    archives = {_href_to_url(m.group(1)) for m in _ARCH_RE.finditer(html)}
+    return sorted(archives)
+
+
+async def scrape(outdir: str, compress: bool = True,
+                 rps: float = REQUESTS_PER_SECOND,
+                 max_concurrent: int = MAX_CONCURRENT):
+    os.makedirs(outdir, exist_ok=True)
+
+    output_file = output_path(outdir, "drn_links.jsonl", check_compress(compress))
+
+    limiter = RateLimiter(max_concurrent, rps)
+    loop = asyncio.get_running_loop()
+
+    # url fingerprint → (url, pages it was found on: "main" or archive URL)
+    seen = {}
+
+    def record(link, source):
+        digest = url_fingerprint(link)
+        if digest not in seen:
+            seen[digest] = (link, [])
+        seen[digest][1].append(source)
+
+    # Link extraction is CPU-bound; run it off the event loop so parsing
+    # one archive does not stall the requests still in flight.
+    with ThreadPoolExecutor(max_workers=max_concurrent) as pool:
+        async with make_session() as session:
+
+            main_page_url = WIKI_BASE + "/wiki/Wikipedia:Dispute_resolution_noticeboard"
+            print("[INFO] Fetching main DRN page...")
+            html = await get_html(main_page_url, session, limiter)
+
+            talk_links = extract_talk_links(html)
+            print(f"[INFO] Found {len(talk_links)} talk links on main page")
+
+            for link in talk_links:
+                record(link, "main")
+
+            archives = extract_archive_links(html)
+            print(f"[INFO] Found {len(archives)} archive pages")
+
+            async def scrape_archive(arch):
+                print(f"[INFO] Processing archive: {arch}")
+                try:
+                    html_arch = await get_html(arch, session, limiter)
+                except Exception as e:
+                    print(f"[ERROR] Failed to scrape archive {arch}: {e}")
+                    return arch, []
+                talk_links_arch = await loop.run_in_executor(
+                    pool, extract_talk_links, html_arch)
+                print(f"  Found {len(talk_links_arch)} talk links in {arch}")
+                return arch, talk_links_arch
+
+            tasks = [asyncio.create_task(scrape_archive(arch)) for arch in archives]
+            results = await asyncio.gather(*tasks)
+
+    # Record in sorted archive order so drn_links.jsonl (record order and
+    # each "sources" list) does not depend on network timing.
+    for arch, talk_links_arch in results:
+        for link in talk_links_arch:
+            record(link, arch)
+
+    with open_jsonl_writer(output_file) as fout:
+        for url, sources in seen.values():
+            fout.write(json_dumps({"url": url, "sources": sources}) + b"\n")
+
+    print(f"[INFO] {len(seen)} unique talk links")
+    print(f"[DONE] All DRN links saved to: {output_file}")
+
+
+# ---------------------------------------------------------------------------
+# fetch: Talk: links → wikitext
+# ---------------------------------------------------------------------------
+
+def cache_key(title: str) -> str:
+    return hashlib.sha1(title.encode("utf8")).hexdigest()
+
+
+def pack_wikitext(wikitext: str) -> bytes:
+    # Level 1 is cheap and still shrinks wikitext ~4x while pages wait
+    # to be written out.
+    return zlib.compress(wikitext.encode("utf8"), 1)
+
+
+def unpack_wikitext(page: dict) -> str:
+    return zlib.decompress(page["wikitext_z"]).decode("utf8")
+
+
+async def query_api(params: dict, session: aiohttp.ClientSession,
+                    limiter: RateLimiter, retries=3):
+    for attempt in range(retries):
+        try:
+            async with limiter:
+                async with session.get(API_ENDPOINT, params=params) as r:
+                    r.raise_for_status()
+                    return json_loads(await r.read())
+        except Exception as e:
+            print(f"[WARN] API error (attempt {attempt+1}/{retries}): {e}")
+            if not is_transient(e) or attempt == retries - 1:
+                break
+            await asyncio.sleep(retry_delay(e, attempt))
+    return None
+
+
+async def fetch_wikitext_batch(titles: list, session: aiohttp.ClientSession,
+                               limiter: RateLimiter):
+    """
+    Fetch wikitext for up to BATCH_SIZE titles in one API query.
+
+    Returns:
+        {requested_title: {"wikitext_z": ..., "timestamp": ..., "fetched_at": ...}}
+        where wikitext_z is the zlib-compressed wikitext (see pack_wikitext).
+        Missing pages and failed requests are left out.
+    """
+    params = {
+        "action": "query",
+        "format": "json",
+        "prop": "revisions",
+        "rvprop": "content|timestamp",
+        "rvslots": "main",
+        "titles": "|".join(titles),
+        "formatversion": 2
+    }
+
+    # The API answers with normalized titles ("Talk:A_b" → "Talk:A b")
+    normalized = {}
+    pages_by_title = {}
+
+    while True:
+        data = await query_api(params, session, limiter)
+        if data is None:
+            print(f"[ERROR] Failed after retries: batch starting at {titles[0]}")
+            break
+
+        fetched_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        query = data.get("query", {})
+        for n in query.get("normalized", []):
+            normalized[n["from"]] = n["to"]
+
+        for page in query.get("pages", []):
+            if "missing" in page or "invalid" in page:
+                continue
+            revs = page.get("revisions")
+            if not revs:
+                continue
+            rev = revs[0]
+            pages_by_title[page["title"]] = {
+                "wikitext_z": pack_wikitext(
+                    rev.get("slots", {}).get("main", {}).get("content", "")),
+                "timestamp": rev.get("timestamp"),
+                "fetched_at": fetched_at
+            }
+
+        # Large batches may be split over several responses
+        if "continue" not in data:
+            break
+        params = {**params, **data["continue"]}
+
+    results = {}
+    for title in titles:
+        page = pages_by_title.get(normalized.get(title, title))
+        if page is not None:
+            results[title] = page
+    return results
+
+
+async def post_export(titles: list, session: aiohttp.ClientSession,
+                      limiter: RateLimiter, retries=3):
+    form = {"pages": "\n".join(titles), "curonly": "1", "action": "submit"}
+    # The server may think for a while before a dump of many pages starts
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+    for attempt in range(retries):
+        try:
+            async with limiter:
+                async with session.post(EXPORT_ENDPOINT, data=form,
+                                        timeout=timeout) as r:
+                    r.raise_for_status()
+                    return await r.read()
+        except Exception as e:
+            print(f"[WARN] Export error (attempt {attempt+1}/{retries}): {e}")
+            if not is_transient(e) or attempt == retries - 1:
+                break
+            await asyncio.sleep(retry_delay(e, attempt))
+    return None
+
+
+def parse_export(xml: bytes, fetched_at: str):
+    """
+    Stream <page> elements out of a Special:Export XML dump.
+
+    Returns:
+        {title: {"wikitext_z": ..., "timestamp": ..., "fetched_at": ...}}
+        with titles as MediaWiki spells them (spaces, not underscores).
+    """
+    pages_by_title = {}
+    # The export schema version (export-0.10, 0.11, ...) changes over time
+    for _, page in etree.iterparse(io.BytesIO(xml), events=("end",), tag="{*}page"):
+        title = page.findtext("{*}title")
+        rev = page.find("{*}revision")
+        if title is not None and rev is not None:
+            pages_by_title[title] = {
+                "wikitext_z": pack_wikitext(rev.findtext("{*}text") or ""),
+                "timestamp": rev.findtext("{*}timestamp"),
+                "fetched_at": fetched_at
+            }
+        page.clear()
+        while page.getprevious() is not None:
+            del page.getparent()[0]
+    return pages_by_title
+
+
+def title_key(title: str) -> str:
+    """
+    Approximate MediaWiki title normalization: underscores → spaces,
+    collapsed whitespace, namespace case-folded (namespace names are
+    case-insensitive), first letter of the page name upper-cased.
+        "TALK:foo_bar" → "Talk:Foo bar"
+    """
+    title = " ".join(title.replace("_", " ").split())
+    ns, sep, name = title.partition(":")
+    if not sep:
+        return title[:1].upper() + title[1:]
+    ns, name = ns.strip(), name.strip()
+    return ns.capitalize() + ":" + name[:1].upper() + name[1:]
+
+
+async def fetch_wikitext_export(titles: list, session: aiohttp.ClientSession,
+                                limiter: RateLimiter):
+    """
+    Same contract as fetch_wikitext_batch, but fetches up to
+    EXPORT_BATCH_SIZE titles in a single Special:Export request.
+    """
+    xml = await post_export(titles, session, limiter)
+    if xml is None:
+        print(f"[ERROR] Failed after retries: export starting at {titles[0]}")
+        return {}
+
+    fetched_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    try:
+        pages_by_title = parse_export(xml, fetched_at)
+    except etree.XMLSyntaxError as e:
+        # HTML error/maintenance pages and truncated bodies can come with 200
+        print(f"[ERROR] Unparsable reply ({e}): export starting at {titles[0]}")
+        return {}
+    del xml
+
+    # Special:Export has no "normalized" list like the query API, so match
+    # requested and exported titles on the same normalized key.
+    pages_by_key = {title_key(title): page for title, page in pages_by_title.items()}
+
+    results = {}
+    for title in titles:
+        page = pages_by_key.get(title_key(title))
+        if page is not None:
+            results[title] = page
+    return results
+
+
+def split_title_and_anchor(url: str):
+    """
+    url example:
+        https://en.wikipedia.org/wiki/Talk:Page_Title#Section_Name
+
+    Returns:
+        title = "Talk:Page_Title"
+        anchor = "Section_Name" or None
+    """
+    m = _URL_RE.match(url)
+    if m and _WIKI_PREFIX not in url[len(_WIKI_PREFIX):]:
+        page, anchor = m.groups()
+    else:
+        # Other hosts (en.m., simple., ...) and malformed concatenated links:
+        # strip the prefix wherever it occurs and split on the first "#"
+        page, sep, anchor = url.replace(_WIKI_PREFIX, "").partition("#")
+        if not sep:
+            anchor = None
+
+    return _unquote(page), _unquote(anchor) if anchor is not None else None
+
+
+def write_legacy_flat(fout, title: str, page: dict, title_links: list):
+    wikitext = unpack_wikitext(page)
+    # Write one record per link (wikitext repeated for each anchor)
+    for anchor, url in title_links:
+        output = {
+            "title": title,
+            "anchor": anchor,
+            "url": url,
+            "wikitext": wikitext,
+            "revision_timestamp": page["timestamp"],
+            "fetched_at": page["fetched_at"]
+        }
+        fout.write(json_dumps(output) + b"\n")
+
+
+def write_page(fpages, title: str, page: dict, seen_hashes: dict):
+    """
+    seen_hashes maps wikitext hash → first title that carried it, so that
+    identical bodies (e.g. redirects) are only written once.
+    """
+    wikitext = unpack_wikitext(page)
+    digest = hashlib.blake2b(wikitext.encode("utf8"), digest_size=16).hexdigest()
+    output = {
+        "title": title,
+        "revision_timestamp": page["timestamp"],
+        "fetched_at": page["fetched_at"],
+        "wikitext_hash": digest,
+    }
+    if digest in seen_hashes:
+        output["duplicate_of"] = seen_hashes[digest]
+    else:
+        seen_hashes[digest] = title
+        output["wikitext"] = wikitext
+
+    fpages.write(json_dumps(output) + b"\n")
+
+
+def write_anchors(fanchors, title: str, title_links: list):
+    for anchor, url in title_links:
+        output = {"title": title, "anchor": anchor, "url": url}
+        fanchors.write(json_dumps(output) + b"\n")
+
+
+async def fetch(input_file: str, outdir: str, legacy_flat: bool = False,
+                use_export: bool = False, use_cache: bool = True,
+                refresh: bool = False, compress: bool = True,
+                rps: float = REQUESTS_PER_SECOND,
+                max_concurrent: int = MAX_CONCURRENT):
+    if use_export and etree is None:
+        raise RuntimeError("--use-export requires the lxml package (pip install lxml)")
+    os.makedirs(outdir, exist_ok=True)
+
+    compress = check_compress(compress)
+    out_path = output_path(outdir, "talkpages.jsonl", compress)
+    anchors_path = output_path(outdir, "anchors.jsonl", compress)
+
+    # Only link metadata is kept in memory; wikitext is written out
+    # batch by batch and dropped as soon as its links are emitted.
+    print("[INFO] Reading DRN links...")
+    links_by_title = {}
+    n_links = 0
+    for rec in iter_jsonl(input_file):
+        url = rec["url"]
+        title, anchor = split_title_and_anchor(url)
+        links_by_title.setdefault(title, []).append((anchor, url))
+        n_links += 1
+
+    # Fetch each talk page only once
+    unique_titles = list(links_by_title)
+    print(f"[INFO] {n_links} links → {len(unique_titles)} unique talk pages")
+
+    if use_export:
+        fetch_batch, batch_size = fetch_wikitext_export, EXPORT_BATCH_SIZE
+    else:
+        fetch_batch, batch_size = fetch_wikitext_batch, BATCH_SIZE
+
+    limiter = RateLimiter(max_concurrent, rps)
+    seen_hashes = {}
+
+    if use_cache and diskcache is None:
+        print("[WARN] diskcache is not installed; running without cache")
+        use_cache = False
+
+    with contextlib.ExitStack() as stack:
+        fout = stack.enter_context(open_jsonl_writer(out_path))
+        fanchors = None
+        if not legacy_flat:
+            fanchors = stack.enter_context(open_jsonl_writer(anchors_path))
+        cache = None
+        if use_cache:
+            cache = stack.enter_context(diskcache.Cache(
+                os.path.join(outdir, CACHE_DIRNAME), size_limit=CACHE_SIZE_LIMIT))
+
+        def cached_pages(batch):
+            pages = {}
+            if cache is not None and not refresh:
+                for title in batch:
+                    page = cache.get(cache_key(title))
+                    if page is not None:
+                        pages[title] = page
+            return pages
+
+        def store_pages(pages):
+            for title, page in pages.items():
+                cache.set(cache_key(title), page, expire=CACHE_EXPIRE)
+
+        loop = asyncio.get_running_loop()
+
+        async with make_session() as session:
+
+            async def fetch_missing(missing):
+                print(f"[INFO] Fetching wikitext for {len(missing)} pages "
+                      f"({missing[0]} … {missing[-1]})")
+                fetched = await fetch_batch(missing, session, limiter)
+                if cache is not None:
+                    await loop.run_in_executor(None, store_pages, fetched)
+                return fetched
+
+            def write_batch(batch, pages):
+                for title in batch:
+                    page = pages.get(title)
+                    if page is None:
+                        print(f"[WARN] No wikitext for {title}")
+                        continue
+                    title_links = links_by_title[title]
+                    if legacy_flat:
+                        write_legacy_flat(fout, title, page, title_links)
+                    else:
+                        write_page(fout, title, page, seen_hashes)
+                        write_anchors(fanchors, title, title_links)
+
+            # Batches are looked up in the cache one at a time and only the
+            # misses are fetched; at most max_concurrent batches are held
+            # in memory, and they are written in input order so output and
+            # duplicate_of attribution are reproducible.
+            pending = collections.deque()
+
+            async def write_oldest():
+                batch, pages, task = pending.popleft()
+                if task is not None:
+                    pages.update(await task)
+                write_batch(batch, pages)
+
+            for i in range(0, len(unique_titles), batch_size):
+                batch = unique_titles[i:i + batch_size]
+                pages = await loop.run_in_executor(None, cached_pages, batch)
+                missing = [title for title in batch if title not in pages]
+                task = None
+                if missing:
+                    task = asyncio.create_task(fetch_missing(missing))
+                pending.append((batch, pages, task))
+                if len(pending) >= max_concurrent:
+                    await write_oldest()
+            while pending:
+                await write_oldest()
+
+    if not legacy_flat:
+        print(f"[DONE] Saved anchors → {anchors_path}")
+    print(f"[DONE] Saved talk pages → {out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p_scrape = subparsers.add_parser("scrape", help="Collect Talk: links from DRN pages")
+    p_scrape.add_argument("--outdir", type=str, default="data",
+                          help="Output directory")
+    p_scrape.add_argument("--no-zstd", action="store_true",
+                          help="Write plain .jsonl instead of zstd-compressed output")
+
+    p_fetch = subparsers.add_parser("fetch", help="Fetch wikitext for scraped links")
+    p_fetch.add_argument("--input", type=str, default=None,
+                         help="Input JSONL (plain or .zst) from `scrape` "
+                              "(default: data/drn_links.jsonl.zst if present, "
+                              "else data/drn_links.jsonl)")
+    p_fetch.add_argument("--outdir", type=str, default="data",
+                         help="Output directory")
+    p_fetch.add_argument("--legacy-flat", action="store_true",
+                         help="Write one record per link with embedded wikitext "
+                              "(old single-file format)")
+    p_fetch.add_argument("--use-export", action="store_true",
+                         help="Fetch wikitext through Special:Export XML dumps "
+                              "instead of the query API")
+    p_fetch.add_argument("--no-cache", action="store_true",
+                         help="Neither read nor write the on-disk page cache")
+    p_fetch.add_argument("--refresh", action="store_true",
+                         help="Refetch every page and overwrite cached entries")
+    p_fetch.add_argument("--no-zstd", action="store_true",
+                         help="Write plain .jsonl instead of zstd-compressed output")
+
+    for p in (p_scrape, p_fetch):
+        p.add_argument("--rps", type=float, default=REQUESTS_PER_SECOND,
+                       help="Max requests started per second (default: %(default)s)")
+        p.add_argument("--max-concurrent", type=int, default=MAX_CONCURRENT,
+                       help="Max requests in flight (default: %(default)s)")
+
+    args = parser.parse_args()
+
+    if args.command == "scrape":
+        asyncio.run(scrape(args.outdir, compress=not args.no_zstd,
+                           rps=args.rps, max_concurrent=args.max_concurrent))
+    else:
+        asyncio.run(fetch(args.input or default_input(), args.outdir,
+                          args.legacy_flat, args.use_export,
+                          use_cache=not args.no_cache, refresh=args.refresh,
+                          compress=not args.no_zstd,
+                          rps=args.rps, max_concurrent=args.max_concurrent))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import drn_pipeline
+from drn_pipeline import fetch_wikitext_export, parse_export, title_key, unpack_wikitext
+
+
+EXPORT_XML = (
+    b'<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/">'
+    b'<page><title>Talk:Foo bar</title>'
+    b'<revision><timestamp>2025-01-01T00:00:00Z</timestamp><text>foo</text></revision>'
+    b'</page></mediawiki>'
+)
+
+EXPORT_XML_010 = (
+    b'<?xml version="1.0"?>\n'
+    b'<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/">'
+    b'<siteinfo><sitename>Wikipedia</sitename></siteinfo>'
+    b'<page><title>User talk:Bar</title>'
+    b'<revision><timestamp>2024-05-06T07:08:09Z</timestamp><text>bar</text></revision>'
+    b'</page>'
+    b'<page><title>Talk:No revision</title></page>'
+    b'<page><title>Talk:Empty</title>'
+    b'<revision><timestamp>2024-01-01T00:00:00Z</timestamp><text/></revision>'
+    b'</page></mediawiki>'
+)
+
+
+def run_export(titles, reply):
+    async def fake_post_export(titles, session, limiter):
+        return reply
+
+    with mock.patch.object(drn_pipeline, "post_export", fake_post_export):
+        return asyncio.run(fetch_wikitext_export(titles, None, None))
+
+
+class TitleKeyTest(unittest.TestCase):
+
+    def test_title_key(self):
+        cases = [
+            ("Talk:Foo bar", "Talk:Foo bar"),
+            ("Talk:Foo_bar", "Talk:Foo bar"),
+            ("talk:foo_bar", "Talk:Foo bar"),
+            ("TALK:foo", "Talk:Foo"),
+            ("user_talk:Example", "User talk:Example"),
+            ("USER TALK:Example", "User talk:Example"),
+            ("Talk: Foo  _bar ", "Talk:Foo bar"),
+            ("foo", "Foo"),
+            ("Talk:Foo:Bar", "Talk:Foo:Bar"),
+            ("", ""),
+        ]
+        for title, expected in cases:
+            with self.subTest(title=title):
+                self.assertEqual(title_key(title), expected)
+
+    def test_variants_share_a_key(self):
+        self.assertEqual(title_key("TALK:foo"), title_key("Talk:Foo"))
+
+
+class ParseExportTest(unittest.TestCase):
+
+    def test_parse_export(self):
+        cases = [
+            (EXPORT_XML, {"Talk:Foo bar": ("foo", "2025-01-01T00:00:00Z")}),
+            (EXPORT_XML_010, {"User talk:Bar": ("bar", "2024-05-06T07:08:09Z"),
+                              "Talk:Empty": ("", "2024-01-01T00:00:00Z")}),
+        ]
+        for xml, expected in cases:
+            with self.subTest(xml=xml[:70]):
+                pages = parse_export(xml, "now")
+                self.assertEqual(
+                    {t: (unpack_wikitext(p), p["timestamp"]) for t, p in pages.items()},
+                    expected)
+                for page in pages.values():
+                    self.assertEqual(page["fetched_at"], "now")
+
+
+class FetchWikitextExportTest(unittest.TestCase):
+
+    def test_valid_reply(self):
+        pages = run_export(["Talk:Foo_bar"], EXPORT_XML)
+        self.assertEqual(list(pages), ["Talk:Foo_bar"])
+        self.assertEqual(unpack_wikitext(pages["Talk:Foo_bar"]), "foo")
+
+    def test_requested_spelling_is_kept(self):
+        pages = run_export(["TALK:foo_bar", "Talk:Missing"], EXPORT_XML)
+        self.assertEqual(list(pages), ["TALK:foo_bar"])
+
+    def test_unparsable_reply_skips_batch(self):
+        for reply in (b"<html><body>Wikimedia Error</body></html>",
+                      EXPORT_XML[:60], b""):
+            with self.subTest(reply=reply[:20]):
+                self.assertEqual(run_export(["Talk:Foo_bar"], reply), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from drn_pipeline import extract_archive_links, extract_talk_links
+
+
+class ExtractLinksTest(unittest.TestCase):
+
+    HTML = (
+        b'<link rel="alternate" href="/wiki/Talk:Linked">'
+        b'<div data-href="/wiki/Talk:DataAttr"></div>'
+        b'<abbr href="/wiki/Talk:Abbr">x</abbr>'
+        b'<a href="/wiki/Talk:Algiers">Talk:Algiers</a>'
+        b'<a class="mw-redirect" title="t" href="/wiki/Talk:Bolzano#Q_&amp;_A">x</a>'
+        b'<a data-href="/wiki/Talk:Nope" href="/wiki/Main_Page">y</a>'
+        b'<a href="/wiki/Talk:Algiers">again</a>'
+        b'<a href="/wiki/Wikipedia:Dispute_resolution_noticeboard/Archive_12">12</a>'
+        b'<link href="/wiki/Wikipedia:Dispute_resolution_noticeboard/Archive_99">'
+    )
+
+    def test_talk_links_only_from_anchor_tags(self):
+        self.assertEqual(extract_talk_links(self.HTML), [
+            "https://en.wikipedia.org/wiki/Talk:Algiers",
+            "https://en.wikipedia.org/wiki/Talk:Bolzano#Q_&_A",
+        ])
+
+    def test_archive_links_only_from_anchor_tags(self):
+        self.assertEqual(extract_archive_links(self.HTML), [
+            "https://en.wikipedia.org/wiki/Wikipedia:Dispute_resolution_noticeboard/Archive_12",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+from drn_pipeline import iter_jsonl, zstd
+
+
+RECORDS = [{"url": "a"}, {"url": "b"}, {"url": "c"}]
+RAW = b'{"url": "a"}\r\n\r\n  \n{"url": "b"}\r\n\t\n{"url": "c"}\r\n\r\n'
+
+
+class IterJsonlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, data):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_plain_skips_blank_and_crlf_lines(self):
+        cases = [
+            (RAW, RECORDS),
+            (RAW.rstrip(), RECORDS),
+            (b"", []),
+            (b"\r\n\n", []),
+        ]
+        for data, expected in cases:
+            with self.subTest(data=data):
+                self.assertEqual(list(iter_jsonl(self.write("in.jsonl", data))),
+                                 expected)
+
+    @unittest.skipIf(zstd is None, "zstandard is not installed")
+    def test_zst_matches_plain(self):
+        path = self.write("in.jsonl.zst", zstd.ZstdCompressor().compress(RAW))
+        self.assertEqual(list(iter_jsonl(path)), RECORDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
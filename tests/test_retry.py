@@ -0,0 +1,134 @@
+import asyncio
+import contextlib
+import types
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from drn_pipeline import MAX_BACKOFF, get_html, is_transient, retry_delay
+
+
+def response_error(status, headers=None):
+    return aiohttp.ClientResponseError(
+        types.SimpleNamespace(real_url="https://example.org/"), (),
+        status=status, headers=headers)
+
+
+class StubResponse:
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def raise_for_status(self):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+
+    async def read(self):
+        return self.outcome
+
+
+class StubSession:
+    """Answers each get() with the next outcome (an exception or a body)."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    @contextlib.asynccontextmanager
+    async def get(self, url):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, asyncio.TimeoutError):
+            raise outcome
+        yield StubResponse(outcome)
+
+
+def run_get_html(outcomes, retries=3):
+    session = StubSession(outcomes)
+    sleep = mock.AsyncMock()
+    with mock.patch("drn_pipeline.asyncio.sleep", sleep):
+        try:
+            result = asyncio.run(get_html("https://example.org/", session,
+                                          contextlib.nullcontext(), retries))
+        except RuntimeError:
+            result = None
+    return result, session.calls, [c.args[0] for c in sleep.await_args_list]
+
+
+class IsTransientTest(unittest.TestCase):
+
+    def test_is_transient(self):
+        cases = [
+            (response_error(404), False),
+            (response_error(403), False),
+            (response_error(400), False),
+            (response_error(429), True),
+            (response_error(500), True),
+            (response_error(503), True),
+            (asyncio.TimeoutError(), True),
+            (aiohttp.ServerDisconnectedError(), True),
+            (ValueError("bad body"), False),
+        ]
+        for error, expected in cases:
+            with self.subTest(error=repr(error)):
+                self.assertIs(is_transient(error), expected)
+
+
+class RetryDelayTest(unittest.TestCase):
+
+    def test_retry_after_is_honoured(self):
+        for status in (429, 503):
+            with self.subTest(status=status):
+                error = response_error(status, {"Retry-After": "7"})
+                self.assertEqual(retry_delay(error, 0), 7.0)
+
+    def test_retry_after_is_capped(self):
+        error = response_error(429, {"Retry-After": "86400"})
+        self.assertEqual(retry_delay(error, 0), MAX_BACKOFF)
+
+    def test_backoff_without_usable_retry_after(self):
+        cases = [
+            response_error(500, {"Retry-After": "7"}),
+            response_error(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+            response_error(429),
+            asyncio.TimeoutError(),
+        ]
+        for error in cases:
+            for attempt in (0, 3, 10):
+                with self.subTest(error=repr(error), attempt=attempt):
+                    base = min(MAX_BACKOFF, 2 ** attempt)
+                    self.assertTrue(base <= retry_delay(error, attempt) <= base + 1)
+
+
+class GetHtmlRetryTest(unittest.TestCase):
+
+    def test_not_found_is_not_retried(self):
+        result, calls, sleeps = run_get_html([response_error(404)])
+        self.assertIsNone(result)
+        self.assertEqual(calls, 1)
+        self.assertEqual(sleeps, [])
+
+    def test_transient_errors_are_retried(self):
+        for error in (response_error(500), asyncio.TimeoutError()):
+            with self.subTest(error=repr(error)):
+                result, calls, sleeps = run_get_html([error, b"<html/>"])
+                self.assertEqual(result, b"<html/>")
+                self.assertEqual(calls, 2)
+                self.assertEqual(len(sleeps), 1)
+
+    def test_no_sleep_after_last_attempt(self):
+        result, calls, sleeps = run_get_html([response_error(500)] * 3)
+        self.assertIsNone(result)
+        self.assertEqual(calls, 3)
+        self.assertEqual(len(sleeps), 2)
+
+    def test_retry_after_is_slept(self):
+        error = response_error(429, {"Retry-After": "5"})
+        result, calls, sleeps = run_get_html([error, b"ok"])
+        self.assertEqual(result, b"ok")
+        self.assertEqual(sleeps, [5.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
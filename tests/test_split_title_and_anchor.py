@@ -0,0 +1,36 @@
+import unittest
+
+from drn_pipeline import split_title_and_anchor
+
+
+class SplitTitleAndAnchorTest(unittest.TestCase):
+
+    CASES = [
+        ("https://en.wikipedia.org/wiki/Talk:Austria-Hungary",
+         ("Talk:Austria-Hungary", None)),
+        ("https://en.wikipedia.org/wiki/Talk:Austria-Hungary#Arbitrary_edit_and_edit_war",
+         ("Talk:Austria-Hungary", "Arbitrary_edit_and_edit_war")),
+        ("https://en.wikipedia.org/wiki/Talk:Battle_of_Maritsa#Skadar_vs._Shkod%C3%ABr",
+         ("Talk:Battle_of_Maritsa", "Skadar_vs._Shkodër")),
+        # Empty fragment keeps an empty anchor
+        ("https://en.wikipedia.org/wiki/Talk:Bolzano#",
+         ("Talk:Bolzano", "")),
+        # Other hosts keep the URL as title but still split off the anchor
+        ("https://en.m.wikipedia.org/wiki/Talk:McLaren_F1#Removal_of_paragraph",
+         ("https://en.m.wikipedia.org/wiki/Talk:McLaren_F1", "Removal_of_paragraph")),
+        ("https://simple.wikipedia.org/wiki/Talk:Earth",
+         ("https://simple.wikipedia.org/wiki/Talk:Earth", None)),
+        # Malformed concatenated links: prefix is stripped wherever it occurs
+        ("https://en.wikipedia.org/wiki/Talk:Chicken_sandwich#Merge_"
+         "https://en.wikipedia.org/wiki/Chicken_burger_with_Chicken_sandwich",
+         ("Talk:Chicken_sandwich", "Merge_Chicken_burger_with_Chicken_sandwich")),
+    ]
+
+    def test_cases(self):
+        for url, expected in self.CASES:
+            with self.subTest(url=url):
+                self.assertEqual(split_title_and_anchor(url), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()